@@ -4,13 +4,22 @@ FastAPI application for calculating Distraction Scores and text de-painting
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 import spacy
-from textblob import TextBlob
-from typing import List, Dict
-import re
+from spacy.symbols import ADJ, ADV
+from textblob.en.sentiments import PatternAnalyzer
+from typing import List, Dict, Iterator
+from functools import lru_cache
+import asyncio
+import math
+import orjson
 
-app = FastAPI(title="DAM Cognitive Firewall API", version="1.0.0")
+app = FastAPI(
+    title="DAM Cognitive Firewall API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,  # orjson serializes much faster than stdlib json
+)
 
 # CORS middleware to allow Chrome extension to communicate
 app.add_middleware(
@@ -21,13 +30,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load Spacy model for NLP processing
+# Load Spacy model for NLP processing.
+# Only POS tags and entities are used: the parser and lemmatizer are skipped,
+# but attribute_ruler must stay since it maps the tagger's tags to token.pos.
 try:
-    nlp = spacy.load("en_core_web_sm")
+    nlp = spacy.load("en_core_web_sm", disable=["parser", "lemmatizer"])
 except OSError:
     # Model not installed, will provide instructions
     nlp = None
 
+# Shared sentiment analyzer, built once instead of per TextBlob instance
+_ANALYZER = PatternAnalyzer()
+_ANALYZER.train()
+
+# Number of distinct texts whose results are memoized (pages are often re-scanned)
+_CACHE_SIZE = 4096
+
+# Snippets shorter than this (button labels, headings) skip NLP entirely
+_MIN_ANALYZE_CHARS = 20
+_MIN_ANALYZE_WORDS = 4
+
+# Parts of speech stripped by the De-Painter, as Spacy's integer POS IDs
+_HYPERBOLE_POS = frozenset((ADJ, ADV))
+
 
 class TextAnalysisRequest(BaseModel):
     text: str
@@ -35,6 +60,9 @@ class TextAnalysisRequest(BaseModel):
 
 
 class TextAnalysisResponse(BaseModel):
+    # Frozen so cached instances can be shared safely between requests
+    model_config = ConfigDict(frozen=True)
+    
     distraction_score: float
     sentiment_polarity: float
     sentiment_subjectivity: float
@@ -44,35 +72,43 @@ class TextAnalysisResponse(BaseModel):
     de_painted_text: str
 
 
+class BatchAnalysisRequest(BaseModel):
+    texts: List[str]
+
+
 class DePaintRequest(BaseModel):
     text: str
 
 
 class DePaintResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     original_text: str
     de_painted_text: str
     removed_adjectives: List[str]
 
 
-def calculate_sentiment_spike(text: str, baseline: str = "") -> float:
+def calculate_sentiment_spike(sentiment_abs: float, baseline_sentiment_abs: float = 0.0) -> float:
     """
     Calculate sentiment spike by comparing text sentiment to baseline.
+    Takes absolute polarities so callers can reuse an existing sentiment analysis.
     Returns a score from 0-1 where higher means more extreme sentiment.
     """
-    blob = TextBlob(text)
-    sentiment = abs(blob.sentiment.polarity)
-    
-    if baseline:
-        baseline_blob = TextBlob(baseline)
-        baseline_sentiment = abs(baseline_blob.sentiment.polarity)
-        spike = abs(sentiment - baseline_sentiment)
-    else:
-        # Without baseline, use absolute polarity as spike indicator
-        spike = sentiment
+    # Without baseline (0.0), the absolute polarity itself is the spike indicator
+    spike = abs(sentiment_abs - baseline_sentiment_abs)
     
     return min(spike, 1.0)
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
+def _sentiment(text: str) -> tuple[float, float]:
+    """
+    Memoized (polarity, subjectivity) of text.
+    The same baseline is usually sent with every snippet from a page.
+    """
+    return tuple(_ANALYZER.analyze(text))
+
+
 def calculate_topical_divergence(text: str, baseline: str = "") -> float:
     """
     Calculate topical divergence using named entities and noun chunks.
@@ -81,24 +117,8 @@ def calculate_topical_divergence(text: str, baseline: str = "") -> float:
     if not nlp:
         return 0.0
     
-    doc = nlp(text)
-    
-    # Count ratio of adjectives and adverbs to total tokens (hyperbole indicator)
-    total_tokens = len([token for token in doc if not token.is_punct and not token.is_space])
-    if total_tokens == 0:
-        return 0.0
-    
-    hyperbolic_tokens = len([token for token in doc if token.pos_ in ["ADJ", "ADV"]])
-    hyperbole_ratio = hyperbolic_tokens / total_tokens
-    
-    # Count entities (factual content indicator)
-    entity_count = len(doc.ents)
-    entity_ratio = min(entity_count / max(total_tokens / 10, 1), 1.0)
-    
-    # Divergence: high hyperbole ratio and low entity ratio = high divergence
-    divergence = (hyperbole_ratio * 0.7) + ((1 - entity_ratio) * 0.3)
-    
-    return min(divergence, 1.0)
+    topical_divergence, _, _ = _analyze_doc(nlp(text))
+    return topical_divergence
 
 
 def de_painter(text: str) -> tuple[str, List[str]]:
@@ -109,23 +129,60 @@ def de_painter(text: str) -> tuple[str, List[str]]:
     if not nlp:
         return text, []
     
-    doc = nlp(text)
+    de_painted_text, removed_adjectives = _de_paint_cached(text)
+    return de_painted_text, list(removed_adjectives)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _de_paint_cached(text: str) -> tuple[str, tuple[str, ...]]:
+    """Memoized de-painter; the removed words are a tuple so callers can't mutate the cache."""
+    _, de_painted_text, removed_adjectives = _analyze_doc(nlp(text))
+    return de_painted_text, tuple(removed_adjectives)
+
+
+def _analyze_doc(doc) -> tuple[float, str, List[str]]:
+    """
+    Single pass over a processed Spacy Doc computing both topical divergence
+    and the De-Painter output.
+    Returns: (topical_divergence, de_painted_text, list_of_removed_adjectives)
+    """
     removed_adjectives = []
     tokens_to_keep = []
+    total_tokens = 0
     
     for token in doc:
+        if not token.is_punct and not token.is_space:
+            total_tokens += 1
+        
         # Remove adjectives and adverbs (intensifiers)
-        if token.pos_ in ["ADJ", "ADV"]:
+        if token.pos in _HYPERBOLE_POS:
             removed_adjectives.append(token.text)
         else:
             tokens_to_keep.append(token.text_with_ws)
     
-    de_painted_text = "".join(tokens_to_keep)
+    # Clean up extra spaces (str.split collapses whitespace runs without a regex)
+    de_painted_text = " ".join("".join(tokens_to_keep).split())
     
-    # Clean up extra spaces
-    de_painted_text = re.sub(r'\s+', ' ', de_painted_text).strip()
+    topical_divergence = _divergence_score(len(removed_adjectives), total_tokens, len(doc.ents))
     
-    return de_painted_text, removed_adjectives
+    return topical_divergence, de_painted_text, removed_adjectives
+
+
+def _divergence_score(hyperbolic_tokens: int, total_tokens: int, entity_count: int) -> float:
+    """Topical divergence from token counts; see calculate_topical_divergence."""
+    if total_tokens == 0:
+        return 0.0
+    
+    # Ratio of adjectives and adverbs to total tokens (hyperbole indicator)
+    hyperbole_ratio = hyperbolic_tokens / total_tokens
+    
+    # Entities are a factual content indicator
+    entity_ratio = min(entity_count / max(total_tokens / 10, 1), 1.0)
+    
+    # Divergence: high hyperbole ratio and low entity ratio = high divergence
+    divergence = (hyperbole_ratio * 0.7) + ((1 - entity_ratio) * 0.3)
+    
+    return min(divergence, 1.0)
 
 
 @app.get("/")
@@ -150,6 +207,92 @@ async def health_check():
     return {"status": "healthy", "nlp_model": "en_core_web_sm"}
 
 
+@app.get("/cache_stats")
+async def cache_stats():
+    """Hit/miss counters for the analysis result caches"""
+    return {
+        "analyze": _analyze_sync.cache_info()._asdict(),
+        "depaint": _de_paint_cached.cache_info()._asdict(),
+        "sentiment": _sentiment.cache_info()._asdict(),
+    }
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _analyze_sync(text: str, baseline: str = "") -> TextAnalysisResponse:
+    """
+    Run the full CPU-bound analysis pipeline for one text.
+    Kept synchronous so it can be offloaded to a worker thread, and memoized
+    per (text, baseline) since the extension often re-sends the same text.
+    """
+    # Parse once and share the Doc between topical divergence and the De-Painter
+    return _analysis_from_doc(text, nlp(text), baseline)
+
+
+def _analyze_batch_lines(texts: List[str]) -> Iterator[bytes]:
+    """
+    Analyze many texts at once, letting Spacy batch them through the pipeline.
+    Yields one NDJSON line per text, in order, as soon as each result is ready.
+    Batch items have no baseline, so the sentiment spike is the absolute polarity.
+    """
+    docs = nlp.pipe((text for text in texts if not _is_short_text(text)), batch_size=64)
+    
+    for text in texts:
+        if _is_short_text(text):
+            result = _short_text_analysis(text)
+        else:
+            result = _analysis_from_doc(text, next(docs))
+        yield orjson.dumps(result.model_dump()) + b"\n"
+
+
+def _quantize(value: float) -> float:
+    """Round a score to 3 decimals, rounding halves up rather than to even like round()."""
+    return math.floor(value * 1000 + 0.5) / 1000
+
+
+def _is_short_text(text: str) -> bool:
+    """Whether text is too short to be worth running through the NLP pipeline."""
+    return len(text) < _MIN_ANALYZE_CHARS or len(text.split()) < _MIN_ANALYZE_WORDS
+
+
+def _short_text_analysis(text: str) -> TextAnalysisResponse:
+    """Canned neutral analysis returned for short snippets without touching NLP."""
+    return TextAnalysisResponse.model_construct(
+        distraction_score=0.0,
+        sentiment_polarity=0.0,
+        sentiment_subjectivity=0.0,
+        adjective_count=0,
+        topical_divergence=0.0,
+        original_text=text,
+        de_painted_text=" ".join(text.split())
+    )
+
+
+def _analysis_from_doc(text: str, doc, baseline: str = "") -> TextAnalysisResponse:
+    """Compute every metric for text from its already-processed Spacy Doc."""
+    # Calculate components
+    sentiment_polarity, sentiment_subjectivity = _sentiment(text)
+    baseline_sentiment = abs(_sentiment(baseline)[0]) if baseline else 0.0
+    
+    sentiment_spike = calculate_sentiment_spike(abs(sentiment_polarity), baseline_sentiment)
+    # Topical divergence and de-painting share one pass over the Doc
+    topical_divergence, de_painted_text, adjectives = _analyze_doc(doc)
+    
+    # Distraction Score: weighted combination
+    # Higher score = more distracting/hyperbolic content
+    distraction_score = (sentiment_spike * 0.4) + (topical_divergence * 0.6)
+    
+    # Every field is computed here with the right type, so skip re-validation
+    return TextAnalysisResponse.model_construct(
+        distraction_score=_quantize(distraction_score),
+        sentiment_polarity=_quantize(sentiment_polarity),
+        sentiment_subjectivity=_quantize(sentiment_subjectivity),
+        adjective_count=len(adjectives),
+        topical_divergence=_quantize(topical_divergence),
+        original_text=text,
+        de_painted_text=de_painted_text
+    )
+
+
 @app.post("/api/analyze", response_model=TextAnalysisResponse)
 async def analyze_text(request: TextAnalysisRequest):
     """
@@ -165,33 +308,29 @@ async def analyze_text(request: TextAnalysisRequest):
             detail="NLP model not loaded. Run: python -m spacy download en_core_web_sm"
         )
     
-    text = request.text
-    baseline = request.baseline_text
-    
-    # Calculate components
-    blob = TextBlob(text)
-    sentiment_polarity = blob.sentiment.polarity
-    sentiment_subjectivity = blob.sentiment.subjectivity
-    
-    sentiment_spike = calculate_sentiment_spike(text, baseline)
-    topical_divergence = calculate_topical_divergence(text, baseline)
+    if _is_short_text(request.text):
+        return _short_text_analysis(request.text)
     
-    # Distraction Score: weighted combination
-    # Higher score = more distracting/hyperbolic content
-    distraction_score = (sentiment_spike * 0.4) + (topical_divergence * 0.6)
+    # NLP work is CPU-bound; run it off the event loop
+    return await asyncio.to_thread(_analyze_sync, request.text, request.baseline_text)
+
+
+@app.post("/api/analyze_batch", response_class=StreamingResponse)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analyze several text snippets in one request
     
-    # De-paint the text
-    de_painted_text, adjectives = de_painter(text)
+    Streams newline-delimited JSON: one /api/analyze result per input text,
+    in the same order, so clients can render results as they arrive.
+    """
+    if not nlp:
+        raise HTTPException(
+            status_code=503,
+            detail="NLP model not loaded. Run: python -m spacy download en_core_web_sm"
+        )
     
-    return TextAnalysisResponse(
-        distraction_score=round(distraction_score, 3),
-        sentiment_polarity=round(sentiment_polarity, 3),
-        sentiment_subjectivity=round(sentiment_subjectivity, 3),
-        adjective_count=len(adjectives),
-        topical_divergence=round(topical_divergence, 3),
-        original_text=text,
-        de_painted_text=de_painted_text
-    )
+    # Starlette iterates sync generators in a worker thread, off the event loop
+    return StreamingResponse(_analyze_batch_lines(request.texts), media_type="application/x-ndjson")
 
 
 @app.post("/api/depaint", response_model=DePaintResponse)
@@ -205,9 +344,9 @@ async def depaint_text(request: DePaintRequest):
             detail="NLP model not loaded. Run: python -m spacy download en_core_web_sm"
         )
     
-    de_painted_text, removed_adjectives = de_painter(request.text)
+    de_painted_text, removed_adjectives = await asyncio.to_thread(de_painter, request.text)
     
-    return DePaintResponse(
+    return DePaintResponse.model_construct(
         original_text=request.text,
         de_painted_text=de_painted_text,
         removed_adjectives=removed_adjectives
@@ -215,5 +354,17 @@ async def depaint_text(request: DePaintRequest):
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    # NLP work is CPU-bound, so scale with processes. Multiple workers need an
+    # import string, so each worker loads its own model on top of the copy this
+    # process already holds; a single worker reuses the app built above.
+    # For production prefer gunicorn with --preload (see README).
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+    )
@@ -1,18 +1,26 @@
 """
 Tests for DAM System Backend API
 """
+import json
+import math
 import pytest
 from fastapi.testclient import TestClient
+from textblob import TextBlob
 import sys
 import os
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-from main import app, calculate_sentiment_spike, calculate_topical_divergence, de_painter, nlp
+from main import app, calculate_sentiment_spike, calculate_topical_divergence, de_painter, nlp, _quantize
 
 client = TestClient(app)
 
+
+def ndjson(response):
+    """Parse a newline-delimited JSON response body"""
+    return [json.loads(line) for line in response.text.splitlines()]
+
 # Check if Spacy model is available
 SPACY_MODEL_AVAILABLE = nlp is not None
 
@@ -33,6 +41,32 @@ class TestBasicEndpoints:
         response = client.get("/health")
         # Either 200 (model loaded) or 503 (model not loaded)
         assert response.status_code in [200, 503]
+        
+    def test_cache_stats_endpoint(self):
+        """Test cache stats endpoint reports every cache"""
+        response = client.get("/cache_stats")
+        assert response.status_code == 200
+        data = response.json()
+        for cache in ("analyze", "depaint", "sentiment"):
+            assert {"hits", "misses", "maxsize", "currsize"} <= set(data[cache])
+            
+    @pytest.mark.skipif(not SPACY_MODEL_AVAILABLE, reason="Requires spacy model installation")
+    def test_repeated_analyze_served_from_cache(self):
+        """Test re-analyzing the same text is a cache hit"""
+        payload = {"text": "The cache test reported a truly remarkable result for the team."}
+        first = client.post("/api/analyze", json=payload)
+        hits_before = client.get("/cache_stats").json()["analyze"]["hits"]
+        
+        second = client.post("/api/analyze", json=payload)
+        hits_after = client.get("/cache_stats").json()["analyze"]["hits"]
+        
+        assert hits_after == hits_before + 1
+        assert second.json() == first.json()
+
+
+def abs_polarity(text):
+    """Absolute sentiment polarity of text, as passed to calculate_sentiment_spike"""
+    return abs(TextBlob(text).sentiment.polarity)
 
 
 class TestSentimentAnalysis:
@@ -42,22 +76,40 @@ class TestSentimentAnalysis:
         """Test basic sentiment spike calculation"""
         # Neutral text
         neutral = "The weather is okay today."
-        score = calculate_sentiment_spike(neutral)
+        score = calculate_sentiment_spike(abs_polarity(neutral))
         assert 0 <= score <= 1
         
     def test_sentiment_spike_extreme(self):
         """Test extreme sentiment detection"""
         # Very positive text
         positive = "This is absolutely amazing and wonderful!"
-        score = calculate_sentiment_spike(positive)
+        score = calculate_sentiment_spike(abs_polarity(positive))
         assert score > 0.3  # Should have noticeable spike
         
     def test_sentiment_spike_with_baseline(self):
         """Test sentiment spike with baseline comparison"""
         baseline = "The company reported earnings."
         sensational = "The company's earnings were absolutely devastating!"
-        score = calculate_sentiment_spike(sensational, baseline)
+        score = calculate_sentiment_spike(abs_polarity(sensational), abs_polarity(baseline))
         assert score > 0  # Should detect difference
+        
+    def test_sentiment_spike_from_polarities(self):
+        """Test spike is the gap between absolute polarities"""
+        assert calculate_sentiment_spike(1.0, 0.0) == 1.0
+        assert calculate_sentiment_spike(0.5, 0.5) == 0.0
+        
+    def test_quantize_rounds_half_up(self):
+        """Test scores are rounded to 3 decimals with halves rounded up"""
+        # 0.0625 is exact in binary, so this is a true tie (round() gives 0.062)
+        assert _quantize(0.0625) == 0.063
+        assert _quantize(-0.1236) == -0.124
+        assert _quantize(-0.1234) == -0.123
+        
+    def test_quantize_tiny_negative_is_positive_zero(self):
+        """Test tiny negative scores quantize to 0.0, not -0.0"""
+        result = _quantize(-0.0004)
+        assert result == 0.0
+        assert math.copysign(1.0, result) == 1.0
 
 
 class TestDePainter:
@@ -135,6 +187,50 @@ class TestAnalyzeEndpoint:
         assert data["distraction_score"] > 0.3
         assert data["adjective_count"] > 2
         
+    @pytest.mark.skipif(not SPACY_MODEL_AVAILABLE, reason="Requires spacy model installation")
+    def test_analyze_short_text_fast_path(self):
+        """Test short snippets get a neutral score without NLP"""
+        response = client.post(
+            "/api/analyze",
+            json={"text": "Absolutely amazing!"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data["distraction_score"] == 0.0
+        assert data["adjective_count"] == 0
+        assert data["de_painted_text"] == "Absolutely amazing!"
+        
+    @pytest.mark.skipif(not SPACY_MODEL_AVAILABLE, reason="Requires spacy model installation")
+    def test_analyze_few_words_fast_path(self):
+        """Test long texts with fewer than 4 words also skip NLP"""
+        response = client.post(
+            "/api/analyze",
+            json={"text": "Extraordinarily magnificent spectacle!"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data["distraction_score"] == 0.0
+        assert data["adjective_count"] == 0
+        
+    @pytest.mark.skipif(not SPACY_MODEL_AVAILABLE, reason="Requires spacy model installation")
+    def test_analyze_newline_separated_words_not_short(self):
+        """Test words separated by newlines count toward the word minimum"""
+        response = client.post(
+            "/api/analyze",
+            json={"text": "Breaking:\nAbsolutely\nincredible\namazing\nnews"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        # Analyzed normally, so the adjectives are found and scored
+        assert data["adjective_count"] > 0
+        assert data["distraction_score"] > 0
+        
     def test_analyze_empty_text(self):
         """Test analyzing empty text"""
         response = client.post(
@@ -147,6 +243,43 @@ class TestAnalyzeEndpoint:
         assert response.status_code in [200, 422, 503]
 
 
+class TestAnalyzeBatchEndpoint:
+    """Test /api/analyze_batch endpoint"""
+    
+    @pytest.mark.skipif(not SPACY_MODEL_AVAILABLE, reason="Requires spacy model installation")
+    def test_analyze_batch_preserves_order(self):
+        """Test batch analysis returns one result per text, in order"""
+        texts = [
+            "The weather is nice today.",
+            "This absolutely incredible and amazing breakthrough is totally revolutionary!",
+        ]
+        response = client.post("/api/analyze_batch", json={"texts": texts})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        data = ndjson(response)
+        
+        assert len(data) == len(texts)
+        assert [item["original_text"] for item in data] == texts
+        assert data[1]["distraction_score"] > data[0]["distraction_score"]
+        
+    @pytest.mark.skipif(not SPACY_MODEL_AVAILABLE, reason="Requires spacy model installation")
+    def test_analyze_batch_matches_single(self):
+        """Test batch results agree with the single-text endpoint"""
+        text = "The quick brown fox jumps over the lazy dog."
+        single = client.post("/api/analyze", json={"text": text}).json()
+        batch = ndjson(client.post("/api/analyze_batch", json={"texts": [text]}))
+        
+        assert batch[0] == single
+        
+    def test_analyze_batch_empty_list(self):
+        """Test batch analysis with no texts"""
+        response = client.post("/api/analyze_batch", json={"texts": []})
+        assert response.status_code in [200, 503]
+        if response.status_code == 200:
+            assert ndjson(response) == []
+
+
 class TestDePaintEndpoint:
     """Test /api/depaint endpoint"""
     